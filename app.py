@@ -30,52 +30,76 @@ st.markdown("""
 @st.cache_data
 def load_data():
     """
-    Loads and preprocesses the dataset.
-    - Handles date parsing and error correction.
-    - Computes 'Severity Score' based on casualties and economic loss.
+    Loads the preprocessed dataset.
+    - Reads the Parquet cache built by 'scripts/build_cache.py'.
+    - Date, log and 'Severity Score' columns are already materialized.
     """
     try:
         # Check path variations for deployment flexibility
         try:
-            df = pd.read_csv('data/cleaned_data_final.csv')
+            df = pd.read_parquet('data/cleaned_data_final.parquet', engine='pyarrow')
         except FileNotFoundError:
-            df = pd.read_csv('../data/cleaned_data_final.csv')
+            df = pd.read_parquet('../data/cleaned_data_final.parquet', engine='pyarrow')
     except Exception as e:
         return None
 
-    # Date Handling: Fill missing months with January
-    df['month_clean'] = df['month'].fillna(1).replace(0, 1).astype(int)
-    
-    # Create datetime object for time-series analysis
-    # Coerce errors to NaT (Not a Time)
-    df['date'] = pd.to_datetime(
-        df['year'].astype(str) + '-' + df['month_clean'].astype(str).str.zfill(2) + '-01', 
-        errors='coerce'
-    )
-    
-    # Fill NaT values with the first day of the recorded year
-    mask_nat = df['date'].isna()
-    df.loc[mask_nat, 'date'] = pd.to_datetime(df.loc[mask_nat, 'year'].astype(str) + '-01-01')
-
-    # Severity Index Calculation (Composite Score)
-    # Log-transform inputs to handle power-law distribution
-    df['log_casualties'] = np.log1p(df['casualties'])
-    df['log_loss'] = np.log1p(df['economic_loss_usd'])
-    df['severity_score'] = (df['log_casualties'] + df['log_loss']) 
-    
-    # Normalize score to 0-100 scale
-    max_score = df['severity_score'].max()
-    if max_score > 0:
-        df['severity_score'] = (df['severity_score'] / max_score) * 100
-    else:
-        df['severity_score'] = 0
-    
     return df
 
+@st.cache_resource
+def build_indices(_df):
+    """
+    Precomputes integer lookups for the categorical filters.
+    - Disaster types are matched on category codes instead of strings.
+    - Countries map to their row positions instead of full-column scans.
+    """
+    type_codes = _df['disaster_type'].cat.codes.to_numpy()
+    country_codes = _df['country'].cat.codes.to_numpy()
+    idx_by_country = {
+        c: np.flatnonzero(country_codes == code)
+        for code, c in enumerate(_df['country'].cat.categories)
+    }
+    return type_codes, idx_by_country
+
+@st.cache_resource
+def build_monthly_cube(_df):
+    """
+    Precomputes event counts per (year, month, disaster type, country).
+    - The seasonal radar sums this small int32 cube instead of grouping rows.
+    - Events without a recorded month are left out, as in the row-level groupby.
+    """
+    years = _df['year'].to_numpy()
+    first_year = int(years.min())
+    n_years = int(years.max()) - first_year + 1
+    n_types = len(_df['disaster_type'].cat.categories)
+    n_countries = len(_df['country'].cat.categories)
+
+    valid = _df['month'].notna().to_numpy()
+    cube = np.zeros((n_years, 12, n_types, n_countries), dtype=np.int32)
+    np.add.at(cube, (
+        years[valid] - first_year,
+        _df['month'].to_numpy()[valid].astype(np.int64) - 1,
+        _df['disaster_type'].cat.codes.to_numpy()[valid],
+        _df['country'].cat.codes.to_numpy()[valid]
+    ), 1)
+    return cube, first_year
+
+@st.cache_resource
+def build_country_summary(_df):
+    """
+    Precomputes casualties and economic loss per (country, year, disaster type).
+    - The high-risk table aggregates this summary instead of the event rows.
+    """
+    return (
+        _df.astype({'economic_loss_usd': 'float64'})
+        .groupby(['country', 'year', 'disaster_type'], observed=True, sort=False)
+        [['casualties', 'economic_loss_usd']].sum()
+        .reset_index()
+    )
+
 # Load data with error handling
 df = load_data()
 if df is None:
-    st.error("CRITICAL ERROR: Data file not found. Please ensure 'cleaned_data_final.csv' is in the 'data' folder.")
+    st.error("CRITICAL ERROR: Data file not found. Please run 'python scripts/build_cache.py' to generate 'cleaned_data_final.parquet' in the 'data' folder.")
     st.stop()
 
 # ==========================================
@@ -90,11 +114,12 @@ with st.sidebar:
     selected_years = st.slider("📅 Analysis Period", min_year, max_year, (min_year, max_year))
 
     # Disaster Type Multiselect
-    all_types = sorted(df['disaster_type'].unique())
+    # Categories are already sorted and unique, no per-rerun scan needed
+    all_types = df['disaster_type'].cat.categories.tolist()
     selected_types = st.multiselect("🌪️ Disaster Types", all_types, default=all_types[:5])
 
     # Country Select
-    all_countries = ["All World"] + sorted(df['country'].unique().tolist())
+    all_countries = ["All World"] + df['country'].cat.categories.tolist()
     selected_country = st.selectbox("📍 Region Focus", all_countries)
 
     # Severity Threshold Slider
@@ -104,29 +129,84 @@ with st.sidebar:
     st.info("**Data Source:** EM-DAT (2018-2024)\n**Version:** 2.1 (Stacked Layout)")
 
 # --- FILTERING LOGIC ---
-filtered_df = df[
-    (df['year'] >= selected_years[0]) & 
-    (df['year'] <= selected_years[1]) &
-    (df['severity_score'] >= severity_threshold)
-]
+def filter_events(selected_years, severity_threshold, selected_types, selected_country):
+    """Applies the sidebar selections to the full dataset."""
+    type_codes, idx_by_country = build_indices(df)
+
+    # Rows are sorted by year, so the year range is a contiguous slice
+    years = df['year'].to_numpy()
+    lo = np.searchsorted(years, selected_years[0], side='left')
+    hi = np.searchsorted(years, selected_years[1], side='right')
+
+    def in_window(idx):
+        """Restricts sorted row positions to the year slice (slice-relative)."""
+        return idx[np.searchsorted(idx, lo):np.searchsorted(idx, hi)] - lo
 
-if selected_types:
-    filtered_df = filtered_df[filtered_df['disaster_type'].isin(selected_types)]
+    mask = df['severity_score'].to_numpy()[lo:hi] >= severity_threshold
 
-if selected_country != "All World":
-    filtered_df = filtered_df[filtered_df['country'] == selected_country]
+    if selected_types:
+        sel_codes = df['disaster_type'].cat.categories.get_indexer(selected_types)
+        mask &= np.isin(type_codes[lo:hi], sel_codes)
+
+    if selected_country != "All World":
+        country_mask = np.zeros(hi - lo, dtype=bool)
+        country_mask[in_window(idx_by_country[selected_country])] = True
+        mask &= country_mask
+
+    return df.iloc[lo + np.flatnonzero(mask)]
+
+def top_risk_countries(selected_years, severity_threshold, selected_types, selected_country):
+    """Returns the 10 countries with the highest casualties for the selection."""
+    if severity_threshold > 0:
+        # The summary has no severity axis, so thresholded views use the rows
+        rows = filter_events(selected_years, severity_threshold, selected_types, selected_country)
+    else:
+        rows = build_country_summary(df)
+        mask = rows['year'].between(selected_years[0], selected_years[1])
+        if selected_types:
+            mask &= rows['disaster_type'].isin(selected_types)
+        if selected_country != "All World":
+            mask &= rows['country'] == selected_country
+        rows = rows[mask]
+    return (
+        rows.groupby('country', observed=True)[['casualties', 'economic_loss_usd']].sum()
+        .nlargest(10, 'casualties')
+    )
+
+@st.cache_data(max_entries=4)
+def to_csv_bytes(*selection):
+    """Encodes the filtered events as CSV once per filter signature."""
+    return filter_events(*selection).to_csv(index=False).encode('utf-8')
+
+# Hashable filter signature: figures are cached on it, so reruns with
+# unchanged filters reuse them instead of rebuilding
+filter_args = (tuple(selected_years), severity_threshold, tuple(selected_types), selected_country)
+filtered_df = filter_events(*filter_args)
 
 # ==========================================
 # 4. VISUALIZATION FUNCTIONS (PLOTLY)
 # ==========================================
 
-def plot_3d_globe(data):
+# Upper bound on markers sent to the browser per scatter figure
+MAX_PLOT_POINTS = 5000
+
+def cap_points(data, n=MAX_PLOT_POINTS):
+    """Keeps the n most severe events so marker count stays bounded."""
+    if len(data) > n:
+        return data.nlargest(n, 'severity_score')
+    return data
+
+@st.cache_data(ttl=3600, max_entries=32)
+def plot_3d_globe(*selection):
     """Renders an interactive 3D Orthographic Globe."""
+    data = filter_events(*selection)
     if data.empty: return None
     
     # Filter valid coordinates
     map_data = data.dropna(subset=['latitude', 'longitude'])
     if map_data.empty: return None
+    n_events = len(map_data)
+    map_data = cap_points(map_data)
 
     fig = px.scatter_geo(
         map_data,
@@ -136,49 +216,97 @@ def plot_3d_globe(data):
         hover_name='country',
         hover_data={'year': True, 'casualties': True, 'economic_loss_usd': True},
         projection="orthographic", 
-        title=f"Global Risk Globe ({len(map_data)} Events)",
+        title=f"Global Risk Globe ({n_events} Events)",
         template="plotly_dark",
         color_discrete_sequence=px.colors.qualitative.Bold
     )
     fig.update_layout(margin={"r":0,"t":50,"l":0,"b":0}, height=550)
     return fig
 
-def plot_seasonal_radar(data):
+@st.cache_data(ttl=3600, max_entries=32)
+def plot_seasonal_radar(*selection):
     """Renders a Polar/Radar chart for seasonal analysis."""
-    if data.empty: return None
+    selected_years, severity_threshold, selected_types, selected_country = selection
+
+    if severity_threshold > 0:
+        # The cube has no severity axis, so thresholded views group the rows
+        data = filter_events(*selection)
+        monthly = data.groupby('month').size()
+        months = monthly.index.to_numpy().astype(int)
+        counts = monthly.to_numpy()
+    else:
+        cube, first_year = build_monthly_cube(df)
+        counts = cube[selected_years[0] - first_year:selected_years[1] - first_year + 1]
+        if selected_types:
+            type_codes = df['disaster_type'].cat.categories.get_indexer(selected_types)
+            counts = counts[:, :, type_codes]
+        if selected_country != "All World":
+            country_code = df['country'].cat.categories.get_loc(selected_country)
+            counts = counts[:, :, :, [country_code]]
+        counts = counts.sum(axis=(0, 2, 3))
+        months = np.flatnonzero(counts) + 1
+        counts = counts[months - 1]
+
+    if len(months) == 0: return None
     
-    monthly = data.groupby('month').size().reset_index(name='count')
+    month_names = np.array(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                            'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
     # Close the loop for radar chart
-    monthly = pd.concat([monthly, monthly.iloc[[0]]], ignore_index=True)
+    r = np.concatenate([counts, counts[:1]])
+    theta = month_names[np.concatenate([months, months[:1]]) - 1]
     
-    month_map = {1:'Jan', 2:'Feb', 3:'Mar', 4:'Apr', 5:'May', 6:'Jun', 
-                 7:'Jul', 8:'Aug', 9:'Sep', 10:'Oct', 11:'Nov', 12:'Dec'}
-    monthly['month_name'] = monthly['month'].map(month_map)
-    
-    fig = px.line_polar(
-        monthly, r='count', theta='month_name', line_close=True,
-        title="Seasonal Cyclicity (Radar Analysis)", template="plotly_dark", markers=True
+    fig = go.Figure(go.Scatterpolar(
+        r=r, theta=theta, mode='lines+markers',
+        fill='toself', line_color='#00CC96'
+    ))
+    fig.update_layout(
+        title="Seasonal Cyclicity (Radar Analysis)", template="plotly_dark",
+        polar=dict(angularaxis=dict(direction='clockwise', rotation=90))
     )
-    fig.update_traces(fill='toself', line_color='#00CC96')
     return fig
 
-def plot_severity_boxplot(data):
+@st.cache_data(ttl=3600, max_entries=32)
+def plot_severity_boxplot(*selection):
     """Renders Boxplots to show distribution and outliers."""
+    data = filter_events(*selection)
     if data.empty: return None
-    fig = px.box(
-        data, x='disaster_type', y='casualties', color='disaster_type',
-        log_y=True, title="Severity Distribution & Outliers (Log Scale)",
-        template="plotly_dark", points="outliers"
+
+    # Quartiles and whiskers are computed server-side; only outliers are sent
+    colors = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    groups = data.groupby('disaster_type', observed=True, sort=False)['casualties']
+    for i, (disaster_type, casualties) in enumerate(groups):
+        values = casualties.to_numpy()
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        # Whiskers end at the most extreme values within 1.5 IQR (Tukey)
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        lower, upper = inside.min(), inside.max()
+        fig.add_trace(go.Box(
+            x=[disaster_type], name=disaster_type, legendgroup=disaster_type,
+            q1=[q1], median=[median], q3=[q3], lowerfence=[lower], upperfence=[upper],
+            y=[values[(values < lower) | (values > upper)]], boxpoints='outliers',
+            marker_color=colors[i % len(colors)]
+        ))
+
+    fig.update_layout(
+        title="Severity Distribution & Outliers (Log Scale)", template="plotly_dark",
+        xaxis_title='disaster_type', yaxis_title='casualties', legend_title_text='disaster_type'
     )
+    fig.update_yaxes(type='log')
     return fig
 
-def plot_sunburst(data):
+@st.cache_data(ttl=3600, max_entries=32)
+def plot_sunburst(*selection):
     """Renders a Hierarchical Sunburst Chart."""
+    data = filter_events(*selection)
     if data.empty: return None
     
     # Aggregate for performance
-    df_sun = data.groupby(['disaster_type', 'country']).size().reset_index(name='count')
-    df_sun = df_sun.sort_values('count', ascending=False).head(100)
+    df_sun = (
+        data.groupby(['disaster_type', 'country'], observed=True).size()
+        .nlargest(100).rename('count').reset_index()
+    )
     
     fig = px.sunburst(
         df_sun, path=['disaster_type', 'country'], values='count',
@@ -188,11 +316,13 @@ def plot_sunburst(data):
     fig.update_layout(height=600)
     return fig
 
-def plot_correlation_scatter(data):
+@st.cache_data(ttl=3600, max_entries=32)
+def plot_correlation_scatter(*selection):
     """Renders a Log-Log Scatter plot for Impact Analysis."""
+    data = filter_events(*selection)
     if data.empty: return None
     fig = px.scatter(
-        data, x="economic_loss_usd", y="casualties", color="disaster_type",
+        cap_points(data), x="economic_loss_usd", y="casualties", color="disaster_type",
         size="severity_score", log_x=True, log_y=True, hover_name="country",
         title="Impact Correlation: Casualties vs. Economic Loss", template="plotly_dark",
         labels={"economic_loss_usd": "Economic Loss ($)", "casualties": "Casualties"}
@@ -219,66 +349,79 @@ col4.metric("Avg Severity Score", f"{avg_severity:.1f}/100")
 st.markdown("---")
 
 # --- ANALYTICAL TABS ---
+# Lazy tabs: selecting a tab triggers a rerun and only the open tab is built
 tab1, tab2, tab3, tab4 = st.tabs([
     "🌍 Geospatial Intelligence", 
     "⏱️ Temporal Dynamics", 
     "📊 Comparative Statistics",
     "🔗 Impact Correlations"
-])
+], key="active_tab", on_change="rerun")
 
 # TAB 1: GEOSPATIAL (MAP & TABLE)
 with tab1:
-    # 1. 3D Globe Visualization
-    st.plotly_chart(plot_3d_globe(filtered_df), use_container_width=True)
+    if tab1.open:
+        # 1. 3D Globe Visualization
+        st.plotly_chart(plot_3d_globe(*filter_args), use_container_width=True)
     
-    st.markdown("### 🚨 High-Risk Zones Summary")
-    # 2. Risk Data Table
-    top_risk = filtered_df.groupby('country')[['casualties', 'economic_loss_usd']].sum().sort_values('casualties', ascending=False).head(10)
-    st.dataframe(
-        top_risk.style.format({"casualties": "{:,.0f}", "economic_loss_usd": "${:,.0f}"}), 
-        use_container_width=True
-    )
-    # Download Button
-    csv = filtered_df.to_csv(index=False).encode('utf-8')
-    st.download_button("📥 Download Filtered Data (CSV)", data=csv, file_name="disaster_data.csv", mime="text/csv")
+        st.markdown("### 🚨 High-Risk Zones Summary")
+        # 2. Risk Data Table
+        top_risk = top_risk_countries(*filter_args)
+        top_risk_disp = top_risk.assign(
+            casualties=top_risk['casualties'].map('{:,.0f}'.format),
+            economic_loss_usd=top_risk['economic_loss_usd'].map('${:,.0f}'.format)
+        )
+        st.dataframe(top_risk_disp, use_container_width=True)
+        # Download Button
+        csv = to_csv_bytes(*filter_args)
+        st.download_button("📥 Download Filtered Data (CSV)", data=csv, file_name="disaster_data.csv", mime="text/csv")
 
 # TAB 2: TIME SERIES & SEASONALITY
 with tab2:
-    col_line, col_radar = st.columns([2, 1])
-    with col_line:
-        # Time Series (Area Chart)
-        valid_dates_df = filtered_df.dropna(subset=['date'])
+    if tab2.open:
+        col_line, col_radar = st.columns([2, 1])
+        with col_line:
+            # Time Series (Area Chart)
+            valid_dates_df = filtered_df.dropna(subset=['date'])
         
-        if not valid_dates_df.empty:
-            daily_counts = valid_dates_df.set_index('date').resample('M').size().reset_index(name='count')
-            fig_line = px.area(daily_counts, x='date', y='count', title="Activity Timeline (Monthly)", template="plotly_dark")
-            st.plotly_chart(fig_line, use_container_width=True)
-        else:
-            st.warning("Insufficient date data for time-series analysis.")
+            if not valid_dates_df.empty:
+                # Monthly bucket counts via bincount (empty months stay at zero)
+                months = valid_dates_df['date'].to_numpy().astype('datetime64[M]')
+                first_month = months.min()
+                counts = np.bincount((months - first_month).astype(np.int64))
+                daily_counts = pd.DataFrame({
+                    'date': (first_month + np.arange(len(counts))).astype('datetime64[ns]'),
+                    'count': counts
+                })
+                fig_line = px.area(daily_counts, x='date', y='count', title="Activity Timeline (Monthly)", template="plotly_dark")
+                st.plotly_chart(fig_line, use_container_width=True)
+            else:
+                st.warning("Insufficient date data for time-series analysis.")
             
-    with col_radar:
-        # Seasonal Radar Chart
-        st.plotly_chart(plot_seasonal_radar(filtered_df), use_container_width=True)
+        with col_radar:
+            # Seasonal Radar Chart
+            st.plotly_chart(plot_seasonal_radar(*filter_args), use_container_width=True)
 
 # TAB 3: COMPARATIVE ANALYSIS (STACKED LAYOUT)
 with tab3:
-    st.markdown("### 📊 Distribution & Hierarchy Analysis")
+    if tab3.open:
+        st.markdown("### 📊 Distribution & Hierarchy Analysis")
     
-    # 1. Boxplot (Full Width)
-    st.plotly_chart(plot_severity_boxplot(filtered_df), use_container_width=True)
+        # 1. Boxplot (Full Width)
+        st.plotly_chart(plot_severity_boxplot(*filter_args), use_container_width=True)
     
-    st.markdown("---")
+        st.markdown("---")
     
-    # 2. Sunburst (Full Width)
-    st.plotly_chart(plot_sunburst(filtered_df), use_container_width=True)
+        # 2. Sunburst (Full Width)
+        st.plotly_chart(plot_sunburst(*filter_args), use_container_width=True)
 
 # TAB 4: CORRELATIONS
 with tab4:
-    st.markdown("### ⚠️ Relationship: Severity vs. Loss vs. Casualties")
-    col_scatter, col_metric = st.columns([3, 1])
-    with col_scatter:
-        st.plotly_chart(plot_correlation_scatter(filtered_df), use_container_width=True)
-    with col_metric:
-        st.info("💡 **Insight:** Events clustered in the top-right quadrant represent the most catastrophic disasters (High Loss + High Casualties).")
-        with st.expander("Methodology Note"):
-            st.write("Axes are log-scaled to visualize the wide range of impact magnitudes. Bubble size represents the composite Severity Score.")
\ No newline at end of file
+    if tab4.open:
+        st.markdown("### ⚠️ Relationship: Severity vs. Loss vs. Casualties")
+        col_scatter, col_metric = st.columns([3, 1])
+        with col_scatter:
+            st.plotly_chart(plot_correlation_scatter(*filter_args), use_container_width=True)
+        with col_metric:
+            st.info("💡 **Insight:** Events clustered in the top-right quadrant represent the most catastrophic disasters (High Loss + High Casualties).")
+            with st.expander("Methodology Note"):
+                st.write("Axes are log-scaled to visualize the wide range of impact magnitudes. Bubble size represents the composite Severity Score.")
\ No newline at end of file
@@ -10,13 +10,20 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 
+# Magnitude buckets shared by all compact formatters
+_UNITS = ((1e9, "B"), (1e6, "M"), (1e3, "K"))
+
+# Scale a number into its K/M/B bucket, returns (scaled value, suffix)
+def _bucket(x):
+    for base, unit in _UNITS:
+        if x >= base: return x / base, unit
+    return x, ""
+
 # Human-readable number formatting (K/M/B)
 def human_int(n):
-    n = float(n)
-    if n >= 1_000_000_000: return f"{n/1_000_000_000:.1f}B"
-    if n >= 1_000_000:     return f"{n/1_000_000:.1f}M"
-    if n >= 1_000:         return f"{n/1_000:.1f}K"
-    return f"{n:.0f}"
+    v, unit = _bucket(float(n))
+    if unit: return f"{v:.1f}{unit}"
+    return f"{v:.0f}"
 
 def plot_hist_log_highlight_median(
     ax,
@@ -47,7 +54,7 @@ def plot_hist_log_highlight_median(
 
     # Build log-spaced bins
     lo, hi = float(s.min()), float(s.max())
-    bins = np.logspace(np.log10(lo), np.log10(hi), bins_n)
+    bins = np.geomspace(lo, hi, bins_n)
 
     # Draw histogram bars only
     counts, edges, patches = ax.hist(
@@ -90,9 +97,10 @@ def plot_hist_log_highlight_median(
 
     # Set titles and axis formatting
     ax.set_title(title, fontweight="bold")
-    if ticks_raw:
-        ticks_use = [t for t in ticks_raw if lo <= t <= hi]
-        if not ticks_use:
+    if ticks_raw is not None and len(ticks_raw):
+        ticks_arr = np.asarray(ticks_raw, dtype=float)
+        ticks_use = ticks_arr[(ticks_arr >= lo) & (ticks_arr <= hi)]
+        if ticks_use.size == 0:
             ticks_use = [lo, hi]
         ax.set_xticks(ticks_use)
 
@@ -105,19 +113,15 @@ def plot_hist_log_highlight_median(
 
 # Compact currency formatting
 def currency_format(x, pos):
-    if x >= 1e9: return f'${x*1e-9:.0f}B'
-    if x >= 1e6: return f'${x*1e-6:.0f}M'
-    if x >= 1e3: return f'${x*1e-3:.0f}K'
-    return f'${x:.0f}'
+    v, unit = _bucket(x)
+    return f'${v:.0f}{unit}'
 
 formatter = ticker.FuncFormatter(currency_format)
 
 # Compact number formatting
 def human_format(x, pos):
-    if x >= 1e9: return f'{x*1e-9:.0f}B'
-    if x >= 1e6: return f'{x*1e-6:.0f}M'
-    if x >= 1e3: return f'{x*1e-3:.0f}K'
-    return f'{x:.0f}'
+    v, unit = _bucket(x)
+    return f'{v:.0f}{unit}'
 
 # Currency formatting using human_format
 def currency_format(x, pos):
@@ -125,7 +129,6 @@ def currency_format(x, pos):
 
 # Currency formatting with optional decimals
 def currency_format2(x, pos):
-    if x >= 1e9: return f'${x*1e-9:.1f}B'
-    if x >= 1e6: return f'${x*1e-6:.1f}M'
-    if x >= 1e3: return f'${x*1e-3:.0f}K'
-    return f'${x:.0f}'
+    v, unit = _bucket(x)
+    if unit in ("B", "M"): return f'${v:.1f}{unit}'
+    return f'${v:.0f}{unit}'
@@ -0,0 +1,84 @@
+import os
+import pandas as pd
+import numpy as np
+
+# ==========================================
+# PATHS
+# ==========================================
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = os.path.join(BASE_DIR, 'data', 'cleaned_data_final.csv')
+PARQUET_PATH = os.path.join(BASE_DIR, 'data', 'cleaned_data_final.parquet')
+
+# ==========================================
+# FEATURE ENGINEERING
+# ==========================================
+def build_features(df):
+    """
+    Applies the dashboard feature engineering to the cleaned dataset.
+    - Handles date parsing and error correction.
+    - Computes 'Severity Score' based on casualties and economic loss.
+    """
+    # Date Handling: Fill missing months with January
+    df['month_clean'] = df['month'].fillna(1).replace(0, 1).astype(int)
+
+    # Create datetime object for time-series analysis
+    # Coerce errors to NaT (Not a Time)
+    df['date'] = pd.to_datetime(
+        dict(year=df['year'], month=df['month_clean'], day=1),
+        errors='coerce'
+    )
+
+    # Fill NaT values with the first day of the recorded year
+    df['date'] = df['date'].fillna(pd.to_datetime(dict(year=df['year'], month=1, day=1)))
+
+    # Severity Index Calculation (Composite Score)
+    # Log-transform inputs to handle power-law distribution
+    log_casualties = np.log1p(df['casualties'].to_numpy(dtype=np.float64))
+    log_loss = np.log1p(df['economic_loss_usd'].to_numpy(dtype=np.float64))
+    severity_score = log_casualties + log_loss
+
+    # Normalize score to 0-100 scale (in place, no extra temporaries)
+    max_score = severity_score.max()
+    if max_score > 0:
+        severity_score *= 100 / max_score
+    else:
+        severity_score[:] = 0
+
+    df['log_casualties'] = log_casualties
+    df['log_loss'] = log_loss
+    df['severity_score'] = severity_score
+
+    # Downcast numeric columns to halve memory traffic in filters and aggregations
+    df['casualties'] = df['casualties'].clip(upper=np.iinfo(np.int32).max)
+    df = df.astype({
+        'year': 'int16',
+        'month_clean': 'int8',
+        'casualties': 'int32',
+        'economic_loss_usd': 'float32',
+        'latitude': 'float32',
+        'longitude': 'float32',
+        'log_casualties': 'float32',
+        'log_loss': 'float32',
+        'severity_score': 'float32'
+    })
+
+    # Low-cardinality labels as categories (faster isin / == / groupby)
+    df[['disaster_type', 'country']] = df[['disaster_type', 'country']].astype('category')
+
+    # Sort by year so the dashboard can slice year ranges with a binary search
+    df = df.sort_values('year', kind='stable').reset_index(drop=True)
+
+    return df
+
+# ==========================================
+# BUILD
+# ==========================================
+def main():
+    """Reads the cleaned CSV once and writes the enriched dataset as Parquet."""
+    df = pd.read_csv(CSV_PATH)
+    df = build_features(df)
+    df.to_parquet(PARQUET_PATH, engine='pyarrow', compression='zstd', index=False)
+    print(f"Wrote {len(df):,} rows to {PARQUET_PATH}")
+
+if __name__ == '__main__':
+    main()